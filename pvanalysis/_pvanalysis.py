@@ -133,11 +133,11 @@ class PVAnalysis():
         elif self.fitsdata.naxis == 3:
             data = np.squeeze(data) # Remove stokes I
         # check quadrant
-        quadcheck = lambda a: (np.sum(a[:nvh, :nxh])
-                               + np.sum(a[nvh:, nxh:])
-                               - np.sum(a[:nvh, nxh:])
-                               - np.sum(a[nvh:, :nxh]))
-        q = np.sign(quadcheck(data))
+        # +1 for the 1st/3rd quadrants and -1 for the 2nd/4th in one pass
+        sv = np.where(np.arange(self.fitsdata.nv) < nvh, 1., -1.)
+        sx = np.where(np.arange(self.fitsdata.nx) < nxh, 1., -1.)
+        q = float(sv @ data @ sx)
+        q = (q > 0) - (q < 0)  # sign without a ufunc call
         if quadrant is None:
             self.quadrant = '13' if q > 0 else '24'
         else:
@@ -209,9 +209,9 @@ class PVAnalysis():
 
         # error clip
         def clipped_error(err, val, mode):
-            res    = self.res_off if mode == 'x' else self.delv
-            minabs = [minabserr * res] * len(err)
-            return np.max([err, minrelerr * np.abs(val), minabs], axis=0)
+            res = self.res_off if mode == 'x' else self.delv
+            return np.maximum(np.maximum(err, minrelerr * np.abs(val)),
+                              minabserr * res)
 
         # sort results
         for re in ['ridge', 'edge']:
@@ -265,13 +265,14 @@ class PVAnalysis():
                     if not nanbeforecross: break
                     x1, v0, _, _ = store['xcut'][rb]
                     x0, v1, _, _ = store['vcut'][rb]
-                    X1, X0 = np.meshgrid(x1, x0)
-                    V0, V1 = np.meshgrid(v0, v1)
-                    xvd = np.hypot((X1 - X0) / self.res_off,
-                                   (V0 - V1) / self.delv)
+                    # (len(x0), len(x1)) by broadcasting
+                    xvd = np.hypot((x1[np.newaxis, :] - x0[:, np.newaxis])
+                                   / self.res_off,
+                                   (v0[np.newaxis, :] - v1[:, np.newaxis])
+                                   / self.delv)
                     if np.any(~np.isnan(xvd)):
                         iv, ix = np.unravel_index(np.nanargmin(xvd),
-                                                  np.shape(X1))
+                                                  np.shape(xvd))
                         x1[:ix] = np.nan
                         v1[:iv] = np.nan
             # combine xcut and vcut
@@ -285,14 +286,13 @@ class PVAnalysis():
                     # remove nan
                     for xv, ival in zip(['xcut', 'vcut'], [0, 1]):
                         ref = store[xv][rb]
-                        s = [k[~np.isnan(ref[ival])] for k in ref]
+                        good = ~np.isnan(ref[ival])
+                        s = [k[good] for k in ref]
                         store[xv][rb] = s
                         res_f[xv][rb] = s
                     # combine xcut/vcut
-                    res_comb = np.array(
-                        [np.append(store['xcut'][rb][k],
-                                   store['vcut'][rb][k])
-                         for k in range(4)])
+                    res_comb = np.concatenate([store['xcut'][rb],
+                                               store['vcut'][rb]], axis=1)
                 elif not ((self.results[re]['xcut'] is None)
                           and (self.results[re]['vcut'] is None)):
                     # only remove nan
@@ -300,8 +300,9 @@ class PVAnalysis():
                         xv, ival, ref = 'xcut', 0, store['xcut'][rb]
                     else:
                         xv, ival, ref = 'vcut', 1, store['vcut'][rb]
-                    res_comb = [k[~np.isnan(ref[ival])] for k in ref]
-                    res_f[xv][rb] = [k[~np.isnan(ref[ival])] for k in ref]
+                    good = ~np.isnan(ref[ival])
+                    res_comb = [k[good] for k in ref]
+                    res_f[xv][rb] = [k[good] for k in ref]
                 else:
                     print('ERROR\tsort_fitresults: '
                           + 'No fitting results are found.')
@@ -315,7 +316,7 @@ class PVAnalysis():
                     res_f[xv][rb][2] = res_f[xv][rb][2]*self.dist
                 ## sort by x
                 i_order  = np.argsort(np.abs(res_comb[0]))
-                res_comb = np.array([np.abs(k[i_order]) for k in res_comb])
+                res_comb = np.abs(np.asarray(res_comb)[:, i_order])
                 # save
                 self.results_sorted[re][rb] = res_comb
             self.results_filtered[re] = res_f
@@ -394,9 +395,9 @@ class PVAnalysis():
         # cutting at an velocity and determining the position
 
         # x & v ranges used for calculation for fitting
-        xaxis_fit = xaxis.copy()
-        vaxis_fit = vaxis.copy()
-        data_fit  = data.copy()
+        xaxis_fit = xaxis
+        vaxis_fit = vaxis
+        data_fit  = data
         if len(xlim) != 4:
             print('Warning\tpvfit_vcut: '
                   + 'Size of xlim is not correct. '
@@ -407,7 +408,7 @@ class PVAnalysis():
         else:
             b = between(xaxis, (xlim[0], xlim[3]))
             xaxis_fit = xaxis[b]
-            data_fit  = np.array([d[b] for d in data])
+            data_fit  = data[:, b]
             xmin, xmax = np.min(xaxis_fit), np.max(xaxis_fit)
             print(f'x range: {xmin:.2f} -- {xmax:.2f} arcsec')
         vmin, vmax = np.min(vaxis_fit), np.max(vaxis_fit)
@@ -421,7 +422,7 @@ class PVAnalysis():
         else:
             b = between(vaxis, (vlim[0], vlim[3]))
             vaxis_fit = vaxis[b]
-            data_fit  = np.array([d[b] for d in data_fit.T]).T
+            data_fit  = data_fit[b, :]
             vmin, vmax = np.min(vaxis_fit), np.max(vaxis_fit)
             print(f'v range: {vmin:.2f} -- {vmax:.2f} km/s')
         # to achieve the same sampling on two sides
@@ -429,8 +430,9 @@ class PVAnalysis():
             xaxis_fit = xaxis_fit[::-1]
             data_fit  = data_fit[:, ::-1]
         # Nyquist sampling
+        # Fortran order so that each sampled column read below is contiguous
         xaxis_fit = xaxis_fit[::hob]
-        data_fit  = data_fit[:, ::hob]
+        data_fit  = np.asfortranarray(data_fit[:, ::hob])
         nloop     = len(xaxis_fit)
         ncol = int(math.ceil(np.sqrt(nloop)))
         nrow = int(math.ceil(nloop / ncol))
@@ -438,7 +440,7 @@ class PVAnalysis():
         fig  = plt.figure(figsize=(11.69, 8.27))
         grid = ImageGrid(fig, rect=111, nrows_ncols=(nrow, ncol),
             axes_pad=0,share_all=True, aspect=False, label_mode='L')
-        dlim = [np.nanmin(data_fit), np.nanmax(data_fit)]
+        dmax = np.nanmax(data_fit)  # top of the marker lines
         # x & y label
         grid[(nrow*ncol - ncol)].set_xlabel(r'Velocity (km s$^{-1}$)')
         grid[(nrow*ncol - ncol)].set_ylabel('Intensity')
@@ -471,7 +473,7 @@ class PVAnalysis():
                 mv, mv_err = ridge_mean(v_i, d_i, rms)
                 # plot
                 if ~np.isnan(mv):
-                    ax.vlines(mv, 0., dlim[-1], lw=1.5,
+                    ax.vlines(mv, 0., dmax, lw=1.5,
                               color='r', ls='--', alpha=0.8)
             elif ridgemode == 'gauss':
                 # get peak indices
@@ -509,7 +511,7 @@ class PVAnalysis():
                             where='mid')
                     ax.plot(v_model, g_model, lw=1.5, color='r',
                             ls='-', alpha=0.8)
-                    ax.vlines(mv, 0., dlim[-1], lw=1.5, color='r',
+                    ax.vlines(mv, 0., dmax, lw=1.5, color='r',
                               ls='--', alpha=0.8)
             else:
                 print('ERROR\tpvfit_vcut: ridgemode must be mean or gauss.')
@@ -540,7 +542,7 @@ class PVAnalysis():
             res_edge[i, :] = [x_i, mv, 0, mv_err]
             # plot
             if ~np.isnan(mv):
-                ax.vlines(mv, 0., dlim[-1], lw=1.5, color='b',
+                ax.vlines(mv, 0., dmax, lw=1.5, color='b',
                           ls='--', alpha=0.8)
             # observed data
             if interp_ridge:
@@ -648,7 +650,7 @@ class PVAnalysis():
         else:  # between can treat tlim=[] now.
             b = between(xaxis, (xlim[0], xlim[3]))
             xaxis_fit = xaxis[b]
-            data_fit  = np.array([d[b] for d in data])
+            data_fit  = data[:, b]
             xmin, xmax = np.min(xaxis_fit), np.max(xaxis_fit)
             print(f'x range: {xmin:.2f} -- {xmax:.2f} arcsec')
 
@@ -662,7 +664,7 @@ class PVAnalysis():
         else:
             b = between(vaxis, (vlim[0], vlim[3]))
             vaxis_fit = vaxis[b]
-            data_fit  = np.array([d[b] for d in data_fit.T]).T
+            data_fit  = data_fit[b, :]
             vmin, vmax = np.min(vaxis_fit), np.max(vaxis_fit)
             print(f'v range: {vmin:.2f} -- {vmax:.2f} km/s')
         # for loop
@@ -677,7 +679,7 @@ class PVAnalysis():
         # x & y label
         grid[(nrow*ncol-ncol)].set_xlabel('Offset (arcsec)')
         grid[(nrow*ncol-ncol)].set_ylabel('Intensity')
-        dlim = [np.nanmin(data_fit), np.nanmax(data_fit)]
+        dmax = np.nanmax(data_fit)  # top of the marker lines
         # list to save final results
         res_ridge = np.empty((nloop, 4))
         res_edge  = np.empty((nloop, 4))
@@ -706,7 +708,7 @@ class PVAnalysis():
                 mx, mx_err = ridge_mean(x_i, d_i, rms)
                 # plot
                 if ~np.isnan(mx):
-                    ax.vlines(mx, 0., dlim[-1], lw=1.5, color='r',
+                    ax.vlines(mx, 0., dmax, lw=1.5, color='r',
                               ls='--', alpha=0.8)
             elif ridgemode == 'gauss':
                 # get peak indices
@@ -744,7 +746,7 @@ class PVAnalysis():
                             where='mid')
                     ax.plot(x_model, g_model, lw=1.5, color='r',
                             ls='-', alpha=0.8)
-                    ax.vlines(mx, 0., dlim[-1], lw=1.5, color='r',
+                    ax.vlines(mx, 0., dmax, lw=1.5, color='r',
                               ls='--', alpha=0.8)
             else:
                 print('ERROR\tpvfit_xcut: ridgemode must be mean or gauss.')
@@ -776,7 +778,7 @@ class PVAnalysis():
             res_edge[i, :] = [mx, v_i, mx_err, 0.]
             # plot
             if ~np.isnan(mx):
-                ax.vlines(mx, 0., dlim[-1], lw=2., color='b',
+                ax.vlines(mx, 0., dmax, lw=2., color='b',
                           ls='--', alpha=0.8)
             # observed data
             if interp_ridge:
@@ -814,7 +816,9 @@ class PVAnalysis():
                       outname: str = 'pvanalysis',
                       rangelevel: float = 0.8,
                       show_corner: bool = False,
-                      calc_evidence: bool = False) -> dict:
+                      calc_evidence: bool = False,
+                      ncore: int = 1,
+                      save_corner: bool = True) -> dict:
         """Fit the derived edge/ridge positions/velocities with a double power law function by using emcee.
 
 
@@ -847,6 +851,15 @@ class PVAnalysis():
             show_corner : bool
                True means the corner figures are shown. These figures are also
                plotted in two png files.
+            calc_evidence : bool
+               True means the Bayesian evidence is calculated with dynesty.
+            ncore : int
+               Number of processes used to evaluate the emcee walkers.
+               Defaults to 1 (serial).
+            save_corner : bool
+               False means the corner png files are not made, which skips
+               the corner plots entirely unless show_corner is True.
+               Defaults to True.
 
         Returns:
             result : dict
@@ -895,32 +908,30 @@ class PVAnalysis():
             q0 = np.array([0, np.sqrt(plim[0][1] * plim[1][1]),
                            fixed_pin, fixed_dp, 0])
             q0 = np.where(include, np.nan, q0)
-            def wpow_r_custom(v, *p):
-                (q := q0 * 1)[np.isnan(q0)] = p
-                return doublepower_r(v, *q)
-            def wpow_v_custom(r, *p):
-                (q := q0 * 1)[np.isnan(q0)] = p
-                return doublepower_v(r, *q)
-            def lnprob(p, v0, x1, dx1, x0, v1, dv1):
-                chi2 = np.sum(((x1 - wpow_r_custom(v0, *p)) / dx1)**2) \
-                       + np.sum(((v1 - wpow_v_custom(x0, *p)) / dv1)**2)
-                return -0.5 * chi2
+            free = np.flatnonzero(np.isnan(q0))
+            # constant during sampling; pass inverse errors to lnprob
+            # and a parameter buffer that already holds the fixed values
+            v0, x1, dx1, x0, v1, dv1 = args
+            wargs = [q0.copy(), free, v0, x1, 1. / dx1, x0, v1, 1. / dv1]
             plim = plim[:, include]
-            popt, perr = emcee_corner(plim, lnprob, args=args,
+            figname = outname + '.corner' + ext + '.png' if save_corner else None
+            popt, perr = emcee_corner(plim, lnprob_doublepower, args=wargs,
                                       labels=labels, rangelevel=rangelevel,
-                                      figname=outname+'.corner'+ext+'.png',
+                                      figname=figname,
                                       show_corner=show_corner,
-                                      ndata=len(args[0]) + len(args[3]))
+                                      ndata=len(args[0]) + len(args[3]),
+                                      ncore=ncore)
             if calc_evidence:
-                dynesty_corner(plim, lnprob, args=args,
+                dynesty_corner(plim, lnprob_doublepower, args=wargs,
                     figname=None, show_corner=False, return_evidence=True)
                 e = 'edge' if ext == '_e' else 'ridge'
                 print(f'\033[1A\033[33C[{e}]')
-            (qopt := q0 * 1)[np.isnan(q0)] = popt
-            (qerr := q0 * 0)[np.isnan(q0)] = perr
+            (qopt := q0 * 1)[free] = popt
+            (qerr := q0 * 0)[free] = perr
             res[:] = [qopt, qerr]
-        print(f'Corner plots in {outname}.corner_e.png '
-              + f'and {outname}.corner_r.png')
+        if save_corner:
+            print(f'Corner plots in {outname}.corner_e.png '
+                  + f'and {outname}.corner_r.png')
         self.popt = {'edge':popt_e, 'ridge':popt_r}
         result = {'edge':{'popt':popt_e[0], 'perr':popt_e[1]},
                   'ridge':{'popt':popt_r[0], 'perr':popt_r[1]}}
@@ -969,17 +980,19 @@ class PVAnalysis():
             return -1
 
         def linfit(x, y, dy):
-            wsum = lambda a: np.sum(a / dy**2)
-            b = np.array([wsum(y), wsum(y * x)])
-            A = np.array([[wsum(1), wsum(x)],
-                          [wsum(x), wsum(x**2)]])
+            w = 1. / dy**2
+            wx = w * x
+            b = np.array([np.dot(w, y), np.dot(wx, y)])
+            A = np.array([[np.sum(w), np.sum(wx)],
+                          [np.sum(wx), np.dot(wx, x)]])
             c = np.dot(Ainv := np.linalg.inv(A), b)
             dc = np.sqrt([Ainv[0, 0], Ainv[1, 1]])
             return c, dc
         def grafit(x, y, dy):
-            wsum = lambda a: np.sum(a / dy**2)
-            c = np.array([0, wsum(x * y) / wsum(x**2)])
-            dc = np.array([0, 1. / np.sqrt(wsum(x**2))])
+            wx = x / dy**2
+            wxx = np.dot(wx, x)
+            c = np.array([0, np.dot(wx, y) / wxx])
+            dc = np.array([0, 1. / np.sqrt(wxx)])
             return c, dc
 
         f = linfit if include_intercept else grafit
@@ -1192,6 +1205,7 @@ class PVAnalysis():
         else:
             self.vsys_opt = self.vsys
             self.avevsys = 0
+        figs = []
         for loglog, ext in zip([False, True], ['linear', 'log']):
             pp = PVPlot(restfrq=self.fitsdata.restfreq,
                         beam=self.fitsdata.beam, pa=self.fitsdata.pa,
@@ -1219,7 +1233,12 @@ class PVAnalysis():
                 self.plot_model(ax=pp.ax, loglog=loglog, flipaxis=flipaxis,
                                 method='ridge', ls=linestyle['ridge'])
             pp.set_axis()
-            pp.savefig(figname=outname + '.' + ext + '.png', show=show)
+            # keep the figures open to show them together below
+            pp.savefig(figname=outname + '.' + ext + '.png', close=not show)
+            figs.append(pp.fig)
+        if show:
+            plt.show()
+            for fig in figs: plt.close(fig)
 
 
     def plot_point(self, ax=None, loglog: bool = False,
@@ -1445,6 +1464,13 @@ class PVAnalysis():
 
 
 ### functions
+def lnprob_doublepower(p, q, free, v0, x1, wx1, x0, v1, wv1):
+    q[free] = p  # only the free slots change between calls
+    rx = (x1 - doublepower_r(v0, *q)) * wx1
+    rv = (v1 - doublepower_v(x0, *q)) * wv1
+    chi2 = np.dot(rx, rx) + np.dot(rv, rv)
+    return -0.5 * chi2
+
 def kepler_mass(r, v, unit):
     return v**2 * np.abs(r) * unit
 
@@ -147,14 +147,10 @@ def dplaw(radii, params):
 	'''
 	vb, rb, pin, pout = params
 
-	vout = np.array([
-		vb*(r/rb)**(-pin) if r < rb else vb*(r/rb)**(-pout)
-		for r in radii
-		])
-	dydx = np.array([
-		(vb/rb)*(-pin)*(r/rb)**(-pin-1) if r < rb else (vb/rb)*(-pout)*(r/rb)**(-pout-1)
-		for r in radii
-		])
+	radii = np.asarray(radii)
+	p     = np.where(radii < rb, pin, pout)
+	vout  = vb*(radii/rb)**(-p)
+	dydx  = (vb/rb)*(-p)*(radii/rb)**(-p-1)
 
 	return vout, dydx
 
@@ -184,21 +180,17 @@ def estimate_perror(params, func, x, y, xerr, yerr, niter=3000):
 
 	'''
 	nparams = len(params)
-	perrors = np.zeros((0,nparams), float)
+	perrors = np.empty((niter,nparams), float)
 
 	for i in range(niter):
 		offest = norm.rvs(size = len(x), loc = x, scale = xerr)
 		velest = norm.rvs(size = len(y), loc = y, scale = yerr)
 		result = optimize.leastsq(func, params, args=(offest, velest, xerr, yerr), full_output = True)
-		perrors = np.vstack((perrors, result[0]))
+		perrors[i] = result[0]
 		#print param_esterr[:,0]
 
-	sigmas = np.array([
-		np.std(perrors[:,i]) for i in range(nparams)
-		])
-	medians = np.array([
-		np.median(perrors[:,i]) for i in range(nparams)
-		])
+	sigmas  = np.std(perrors, axis=0)
+	medians = np.median(perrors, axis=0)
 
 
 	with np.printoptions(precision=4, suppress=True):
@@ -28,7 +28,10 @@ class Impvfits:
         self.file = infile
         with fits.open(infile) as hdul:
             # get primary
-            self.data   = hdul[0].data
+            # FITS data are big-endian; keep a native, C-contiguous copy
+            d = hdul[0].data
+            self.data   = None if d is None else \
+                np.ascontiguousarray(d, dtype=d.dtype.newbyteorder('='))
             self.header = hdul[0].header
             # multibeam?
             if 'CASAMBM' in self.header:
@@ -109,10 +112,9 @@ class Impvfits:
             self.res_off = bmaj
         else:
             if multibeam:
-                res_offs = []
-                for i in range(len(self.beam)):
-                    bmaj, bmin, bpa, _, _ = self.beam[i]
-                    res_offs.append(get_1dresolution(pa, bmaj, bmin, bpa))
+                res_offs = get_1dresolution(pa, self.beam['BMAJ'],
+                                            self.beam['BMIN'],
+                                            self.beam['BPA'])
                 self.res_off = np.nanmax(res_offs)
             elif self.beam is not None:
                 bmaj, bmin, bpa = self.beam
@@ -151,8 +153,8 @@ class Impvfits:
             pc_ij = pc_ij * np.array([del_i[i - 1] for i in rng])
         # axes
         # +1 in i+1 comes from 0 start index in python
-        axes = np.array([np.dot(pc_ij, (i+1 - refpix_i))
-                         for i in range(np.max(naxis_i))]).T
+        pix  = np.arange(1, np.max(naxis_i) + 1)
+        axes = np.dot(pc_ij, pix[np.newaxis, :] - refpix_i[:, np.newaxis])
         # x & v axes
         xaxis = axes[0]
         vaxis = axes[1]
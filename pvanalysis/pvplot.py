@@ -36,6 +36,14 @@ def nice_labels(ticks):
     return [f'{t:.{d:d}f}' for t, d in zip(ticks, -digits)]
 
 
+def nearest_index(t, t0):
+    # Same as np.argmin(np.abs(t - t0)) for a monotonic axis t,
+    # by bisection instead of a full scan. t may be descending.
+    s = 1 if t[-1] > t[0] else -1
+    i = np.clip(np.searchsorted(s * t, s * t0), 1, len(t) - 1)
+    return i - int(np.abs(t[i - 1] - t0) <= np.abs(t[i] - t0))
+
+
 class PVPlot():
     """make a Position-Velocity diagram in color and/or contour maps.
     
@@ -70,11 +78,11 @@ class PVPlot():
         xlim[1] = min(xlim[1], -x[0], x[-1])
         vlim[0] = max(vlim[0], np.abs(v[1] - v[0]))
         vlim[1] = min(vlim[1], -v[0], v[-1])
-        i0 = np.argmin(np.abs(x + xlim[1]))
-        i1 = np.argmin(np.abs(x - xlim[1])) + 1
-        j0 = np.argmin(np.abs(v + vlim[1]))
-        j1 = np.argmin(np.abs(v - vlim[1])) + 1
-        d, x, v = d[j0:j1, i0:i1], x[i0:i1], v[j0:j1]
+        i0 = nearest_index(x, -xlim[1])
+        i1 = nearest_index(x, xlim[1]) + 1
+        j0 = nearest_index(v, -vlim[1])
+        j1 = nearest_index(v, vlim[1]) + 1
+        d, x, v = np.ascontiguousarray(d[j0:j1, i0:i1]), x[i0:i1], v[j0:j1]
         self.jrange = [j0, j1]
         self.d, self.x, self.v = d, x, v
         self.restfrq = restfrq
@@ -85,13 +93,17 @@ class PVPlot():
         self.xlim = xlim
         self.vlim = vlim
         if quadrant is None:
-            ic = np.argmin(np.abs(x))
-            jc = np.argmin(np.abs(v))
-            q = np.mean(d[:jc, :ic]) + np.mean(d[jc:, ic:]) \
-                - np.mean(d[:jc, ic:]) - np.mean(d[jc:, :ic])
+            ic = nearest_index(x, 0)
+            jc = nearest_index(v, 0)
+            # signed 1/size weights give the four quadrant means in one pass
+            wv = np.where(np.arange(len(v)) < jc, 1. / jc, -1. / (len(v) - jc))
+            wx = np.where(np.arange(len(x)) < ic, 1. / ic, -1. / (len(x) - ic))
+            q = wv @ d @ wx
             self.q13 = (q > 0)
         else:
             self.q13 = (quadrant == '13')
+        if loglog:
+            self.gen_loglog()  # shared by add_color and add_contour
          
     def gen_loglog(self) -> None:
         dx, dv = self.x[1] - self.x[0], self.v[1] - self.v[0]
@@ -102,8 +114,8 @@ class PVPlot():
         d = self.d if self.q13 else self.d[:, ::-1]
         di = RBS(self.v, self.x, d)(vi, xi)
         d = (di + di[::-1, ::-1]) / 2.
-        i0 = np.argmin(np.abs(xi - self.xlim[0]))
-        j0 = np.argmin(np.abs(vi - self.vlim[0]))
+        i0 = nearest_index(xi, self.xlim[0])
+        j0 = nearest_index(vi, self.vlim[0])
         xi, vi, d = xi[i0:], vi[j0:], d[j0:, i0:]
         self.xl, self.vl, self.dl = xi, vi, d
 
@@ -129,7 +141,6 @@ class PVPlot():
             else:
                 bmaj, bmin, bpa = self.beam
         if self.loglog:
-            self.gen_loglog()
             x, v, d = self.xl, self.vl, self.dl
         else:
             x, v, d = self.x, self.v, self.d
@@ -138,7 +149,7 @@ class PVPlot():
                     * np.pi / 4. / np.log(2.)
             if type(Omega) == np.ndarray:
                 j0, j1 = self.jrange
-                Omega = np.tile(Omega[j0:j1], (len(x),1)).T
+                Omega = Omega[j0:j1, np.newaxis]  # broadcast along x
             lam = constants.c.to('m/s').value / restfrq
             Jy2K = units.Jy.to('J*s**(-1)*m**(-2)*Hz**(-1)') \
                    * lam**2 / 2. / constants.k_B.to('J/K').value / Omega
@@ -148,7 +159,9 @@ class PVPlot():
             kwargs['vmin'] = np.log10(vmin)
             vmax = kwargs['vmax'] if 'vmax' in kwargs else np.nanmax(d)
             kwargs['vmax'] = np.log10(vmax)
-        if log: d = np.log10(d.clip(np.min(d[d > 0]), None))
+        if log:
+            d = d.clip(np.min(d[d > 0]), None)  # new array; safe to overwrite
+            np.log10(d, out=d)
         kwargs0 = dict(kwargs0, **kwargs)
         ax = self.ax
         if self.flipaxis: x, v, d = v, x, d.T
@@ -193,7 +206,6 @@ class PVPlot():
             else:
                 bmaj, bmin, bpa = self.beam
         if self.loglog:
-            self.gen_loglog()
             x, v, d = self.xl, self.vl, self.dl
         else:
             x, v, d = self.x, self.v, self.d
@@ -201,14 +213,14 @@ class PVPlot():
             Omega = bmaj * bmin / 3600.**2 * np.pi / 4. / np.log(2.)
             if type(Omega) == np.ndarray:
                 j0, j1 = self.jrange
-                Omega = np.tile(Omega[j0:j1], (len(x),1)).T
+                Omega = Omega[j0:j1, np.newaxis]  # broadcast along x
             lam = constants.c.to('m/s').value / restfrq
             Jy2K = units.Jy.to('J*s**(-1)*m**(-2)*Hz**(-1)') \
                    * lam**2 / 2. / constants.k_B.to('J/K').value / Omega
-            d *= Jy2K
+            d = d * Jy2K
         if rms is None:
-            rms = (np.std(d[:5, :]) + np.std(d[-5:, :])
-                   + np.std(d[:, :5]) + np.std(d[:, -5:])) / 4.
+            rms = (np.nanstd(d[:5, :]) + np.nanstd(d[-5:, :])
+                   + np.nanstd(d[:, :5]) + np.nanstd(d[:, -5:])) / 4.
             print(f'rms = {rms:.2e}')
         kwargs0 = dict(kwargs0, **kwargs)
         ax = self.ax
@@ -247,10 +259,10 @@ class PVPlot():
             
                 
     def savefig(self, figname: str = None, show: bool = False,
-                **kwargs) -> None:
+                close: bool = True, **kwargs) -> None:
         kwargs0 = {'bbox_inches': 'tight', 'transparent': True}
         if figname is not None:
             self.fig.savefig(figname, **dict(kwargs0, **kwargs))
         if show: plt.show()
-        plt.close()
+        if close: plt.close(self.fig)
         
\ No newline at end of file
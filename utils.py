@@ -12,6 +12,14 @@ def gauss1d(x, amp, mean, fwhm):
     return amp * np.exp2(-4. * ((x - mean) / fwhm)**2)
 
 
+def lnL(p, log_prob_fn, plim, *args):
+    # Module level so that it can be pickled for multiprocessing.
+    if np.all((plim[0] < p) * (p < plim[1])):
+        return log_prob_fn(p, *args)
+    else:
+        return -np.inf
+
+
 def emcee_corner(bounds, log_prob_fn, args: list = [],
                  nwalkers_per_ndim: int = 16,
                  nburnin: int = 2000, nsteps: int = 2000,
@@ -24,12 +32,6 @@ def emcee_corner(bounds, log_prob_fn, args: list = [],
     nwalkers = ndim * nwalkers_per_ndim
     plim = np.array(bounds)
 
-    def lnL(p, *args):
-        if np.all((plim[0] < p) * (p < plim[1])):
-            return log_prob_fn(p, *args)
-        else:
-            return -np.inf
-
     def gelman_rubin(samples):
         nsteps = len(samples[0])
         B = np.std(np.mean(samples, axis=1), axis=0)
@@ -41,23 +43,25 @@ def emcee_corner(bounds, log_prob_fn, args: list = [],
 
     p0 = plim[0] + (plim[1] - plim[0]) * np.random.rand(nwalkers, ndim)
     converge = True
-    for n in [nburnin, nsteps]:
-        if ncore > 1:
-            with Pool(ncore) as pool:
-                sampler = emcee.EnsembleSampler(nwalkers, ndim, log_prob_fn,
-                                                args=args, pool=pool)
-                # The inner function lnL can't be pickled for multiprocessing.
-                sampler.run_mcmc(p0, n)
-        else:
-            sampler = emcee.EnsembleSampler(nwalkers, ndim, lnL, args=args)
+    # log_prob_fn must be picklable (defined at module level) if ncore > 1.
+    pool = Pool(ncore) if ncore > 1 else None
+    try:
+        for n in [nburnin, nsteps]:
+            sampler = emcee.EnsembleSampler(nwalkers, ndim, lnL,
+                                            args=[log_prob_fn, plim, *args],
+                                            pool=pool)
             sampler.run_mcmc(p0, n)
-        #samples = sampler.get_chain()  # emcee 3.1.1
-        samples = sampler.chain  # emcee 2.2.1
-        if gr_check:
-            GR = gelman_rubin(samples)
-            if GR > 1.25:
-                converge = False
-        p0 = samples[:, -1, :]
+            #samples = sampler.get_chain()  # emcee 3.1.1
+            samples = sampler.chain  # emcee 2.2.1
+            if gr_check:
+                GR = gelman_rubin(samples)
+                if GR > 1.25:
+                    converge = False
+            p0 = samples[:, -1, :]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
     if not converge:
         print('\nWARNING: emcee did not converge (Gelman-Rubin > 1.25).\n')
     #lnp = sampler.get_log_prob()  # emcee 3.1.1